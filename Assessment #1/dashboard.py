@@ -3,157 +3,313 @@ Real-Time Dashboard Module
 Displays current queue status, wait times, and system statistics
 """
 
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from itertools import islice
+from typing import Deque, Dict, List, Optional
 import os
+import shutil
+import sys
+import threading
 import time
 
 
+_DHR = "=" * 80
+_HR = "-" * 80
+_DOCTOR_HEADER = f"{'Doctor ID':<12} {'Specialty':<20} {'Waiting':<10} {'Avg Wait':<12} {'Status':<10}"
+_DOCTOR_ROW_FMT = "{:<12} {:<20} {:<10} {:<10.1f}min {} {}"
+_STATUS_SYM = {"busy": "🔴", "available": "🟢"}
+_PATIENT_HEADER = f"{'Position':<10} {'Patient ID':<15} {'Name':<20} {'Doctor':<10} {'Est. Wait':<12}"
+_PATIENT_ROW_FMT = "{:<10} {:<15} {:<20} Dr. {:<6} {:<10.0f}min"
+
+
+@lru_cache(maxsize=64)
+def _fmt_ts(epoch_sec: int) -> str:
+    """Format a whole-second timestamp, memoized across refreshes"""
+    return datetime.fromtimestamp(epoch_sec).strftime('%Y-%m-%d %H:%M:%S')
+
+
 class Dashboard:
     """Real-time dashboard for patients and staff"""
     
     def __init__(self):
         self.last_update = datetime.now()
+        self.max_patient_rows = 10  # rows shown in the full dashboard queue panel
+        self._buf: List[str] = []
+        self._prev_lines: List[str] = []  # last full dashboard frame on screen
+        self.is_tty = sys.stdout.isatty()  # cosmetic output and live redraws need a terminal
+        
+        if os.name == 'nt':
+            # Enables ANSI escape sequence processing in the Windows console
+            os.system('')
     
     def clear_screen(self):
         """Clear terminal screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self._prev_lines = []
+        if not self.is_tty:
+            return
+        sys.stdout.write('\x1b[2J\x1b[H')
+        sys.stdout.flush()
+    
+    def _write(self, lines: List[str]):
+        """Write a block of lines to stdout with a single write call"""
+        # Anything written below the dashboard invalidates the cached frame
+        self._prev_lines = []
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+    
+    def _write_diff(self, lines: List[str]):
+        """Redraw only the screen rows that changed since the previous frame
+        
+        Assumes the previous frame was drawn from the top of a cleared screen
+        and nothing else has been written since; the cursor is left on the row
+        below the frame, as after a full redraw.
+        """
+        out = []
+        for row, line in enumerate(lines):
+            if row >= len(self._prev_lines) or self._prev_lines[row] != line:
+                out.append(f"\x1b[{row + 1};1H\x1b[2K{line}")
+        
+        # Blank out rows left over from a taller previous frame
+        for row in range(len(lines), len(self._prev_lines)):
+            out.append(f"\x1b[{row + 1};1H\x1b[2K")
+        
+        out.append(f"\x1b[{len(lines) + 1};1H")
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
+    
+    def _render_header(self) -> List[str]:
+        return [
+            _DHR,
+            " " * 20 + "JAYANAGAR SPECIALTY CLINIC",
+            " " * 15 + "Patient Flow Management System",
+            _DHR,
+            f"Last Updated: {_fmt_ts(int(self.last_update.timestamp()))}",
+            _DHR
+        ]
+    
+    def _render_queue_overview(self, statistics: Dict) -> List[str]:
+        return [
+            "\n📊 SYSTEM OVERVIEW",
+            _HR,
+            f"Total Patients Today:        {statistics['total_patients']}",
+            f"Currently Waiting:           {statistics['waiting']}",
+            f"In Consultation:             {statistics['in_consultation']}",
+            f"Completed:                   {statistics['completed']}",
+            f"Doctors Busy:                {statistics['doctors_busy']}",
+            _HR
+        ]
+    
+    def _render_doctor_queues(self, queue_data: List[Dict]) -> List[str]:
+        lines = [
+            "\n👨‍⚕️ DOCTOR-WISE QUEUE STATUS",
+            _HR,
+            _DOCTOR_HEADER,
+            _HR
+        ]
+        
+        lines.extend(
+            _DOCTOR_ROW_FMT.format(
+                data['doctor_id'], data.get('specialty', 'General')[:18], data['queue_length'],
+                data['avg_wait_time'], _STATUS_SYM.get(data['status'], "🟢"), data['status']
+            )
+            for data in queue_data
+        )
+        lines.append(_HR)
+        return lines
+    
+    def _render_patient_queue(self, patients: List[Dict], max_display: int = 10,
+                              total: Optional[int] = None) -> List[str]:
+        lines = [
+            f"\n📋 CURRENT QUEUE (Next {max_display} patients)",
+            _HR,
+            _PATIENT_HEADER,
+            _HR
+        ]
+        
+        lines.extend(
+            _PATIENT_ROW_FMT.format(
+                i, patient['patient_id'], patient['name'][:18], patient['doctor_id'],
+                patient.get('predicted_wait_time', 0)
+            )
+            for i, patient in enumerate(islice(patients, max_display), 1)
+        )
+        
+        if total is None:
+            total = len(patients)
+        if total > max_display:
+            lines.append(f"\n... and {total - max_display} more patients in queue")
+        
+        lines.append(_HR)
+        return lines
+    
+    def _render_patient_info(self, patient: Dict) -> List[str]:
+        return [
+            "\n" + _DHR,
+            "                          PATIENT INFORMATION",
+            _DHR,
+            f"Patient ID:              {patient['patient_id']}",
+            f"Name:                    {patient['name']}",
+            f"Doctor Assigned:         Dr. {patient['doctor_id']}",
+            f"Appointment Time:        {patient['appointment_time']}",
+            f"Arrival Time:            {patient['arrival_time']}",
+            f"Status:                  {patient['status'].upper()}",
+            f"Estimated Wait Time:     {patient.get('predicted_wait_time', 0):.0f} minutes",
+            f"Queue Position:          {patient.get('position', 'N/A')}",
+            _DHR
+        ]
+    
+    def _render_recommendations(self, recommendations: List[str]) -> List[str]:
+        lines = ["\n💡 RECOMMENDATIONS", _HR]
+        for i, rec in enumerate(recommendations, 1):
+            lines.append(f"{i}. {rec}")
+        lines.append(_HR)
+        return lines
     
     def display_header(self):
         """Display dashboard header"""
-        print("=" * 80)
-        print(" " * 20 + "JAYANAGAR SPECIALTY CLINIC")
-        print(" " * 15 + "Patient Flow Management System")
-        print("=" * 80)
-        print(f"Last Updated: {self.last_update.strftime('%Y-%m-%d %H:%M:%S')}")
-        print("=" * 80)
+        self._write(self._render_header())
     
     def display_queue_overview(self, statistics: Dict):
         """Display overall queue statistics"""
-        print("\n📊 SYSTEM OVERVIEW")
-        print("-" * 80)
-        print(f"Total Patients Today:        {statistics['total_patients']}")
-        print(f"Currently Waiting:           {statistics['waiting']}")
-        print(f"In Consultation:             {statistics['in_consultation']}")
-        print(f"Completed:                   {statistics['completed']}")
-        print(f"Doctors Busy:                {statistics['doctors_busy']}")
-        print("-" * 80)
+        self._write(self._render_queue_overview(statistics))
     
     def display_doctor_queues(self, queue_data: List[Dict]):
         """Display queue status for each doctor"""
-        print("\n👨‍⚕️ DOCTOR-WISE QUEUE STATUS")
-        print("-" * 80)
-        print(f"{'Doctor ID':<12} {'Specialty':<20} {'Waiting':<10} {'Avg Wait':<12} {'Status':<10}")
-        print("-" * 80)
-        
-        for data in queue_data:
-            doctor_id = data['doctor_id']
-            specialty = data.get('specialty', 'General')[:18]
-            waiting = data['queue_length']
-            avg_wait = data['avg_wait_time']
-            status = data['status']
-            
-            status_symbol = "🔴" if status == "busy" else "🟢"
-            
-            print(f"{doctor_id:<12} {specialty:<20} {waiting:<10} {avg_wait:<10.1f}min {status_symbol} {status}")
-        
-        print("-" * 80)
-    
-    def display_patient_queue(self, patients: List[Dict], max_display: int = 10):
-        """Display current patient queue"""
-        print(f"\n📋 CURRENT QUEUE (Next {max_display} patients)")
-        print("-" * 80)
-        print(f"{'Position':<10} {'Patient ID':<15} {'Name':<20} {'Doctor':<10} {'Est. Wait':<12}")
-        print("-" * 80)
-        
-        for i, patient in enumerate(patients[:max_display], 1):
-            position = i
-            patient_id = patient['patient_id']
-            name = patient['name'][:18]
-            doctor_id = patient['doctor_id']
-            wait_time = patient.get('predicted_wait_time', 0)
-            
-            print(f"{position:<10} {patient_id:<15} {name:<20} Dr. {doctor_id:<6} {wait_time:<10.0f}min")
-        
-        if len(patients) > max_display:
-            print(f"\n... and {len(patients) - max_display} more patients in queue")
-        
-        print("-" * 80)
+        self._write(self._render_doctor_queues(queue_data))
+    
+    def display_patient_queue(self, patients: List[Dict], max_display: int = 10,
+                              total: Optional[int] = None):
+        """Display current patient queue (total defaults to len(patients))"""
+        self._write(self._render_patient_queue(patients, max_display, total))
     
     def display_patient_info(self, patient: Dict):
         """Display individual patient information"""
-        print("\n" + "=" * 80)
-        print("                          PATIENT INFORMATION")
-        print("=" * 80)
-        print(f"Patient ID:              {patient['patient_id']}")
-        print(f"Name:                    {patient['name']}")
-        print(f"Doctor Assigned:         Dr. {patient['doctor_id']}")
-        print(f"Appointment Time:        {patient['appointment_time']}")
-        print(f"Arrival Time:            {patient['arrival_time']}")
-        print(f"Status:                  {patient['status'].upper()}")
-        print(f"Estimated Wait Time:     {patient.get('predicted_wait_time', 0):.0f} minutes")
-        print(f"Queue Position:          {patient.get('position', 'N/A')}")
-        print("=" * 80)
+        self._write(self._render_patient_info(patient))
     
     def display_recommendations(self, recommendations: List[str]):
         """Display system recommendations"""
-        print("\n💡 RECOMMENDATIONS")
-        print("-" * 80)
-        for i, rec in enumerate(recommendations, 1):
-            print(f"{i}. {rec}")
-        print("-" * 80)
+        self._write(self._render_recommendations(recommendations))
     
     def display_full_dashboard(self, statistics: Dict, doctor_queues: List[Dict], 
-                              patient_queue: List[Dict], recommendations: List[str] = None):
-        """Display complete dashboard"""
-        self.clear_screen()
-        self.last_update = datetime.now()
+                              patient_queue: List[Dict], recommendations: List[str] = None,
+                              footer: Optional[str] = None) -> bool:
+        """Display complete dashboard
         
-        self.display_header()
-        self.display_queue_overview(statistics)
-        self.display_doctor_queues(doctor_queues)
-        self.display_patient_queue(patient_queue)
+        Calling this again without clearing the screen in between redraws the
+        frame in place, and does nothing if only the timestamp would change.
+        footer (e.g. an input prompt) is drawn as part of the frame.
+        
+        Returns True if the frame fits on the terminal so that later calls can
+        redraw it in place, False if they would have to clear and reprint it.
+        """
+        # Build everything below the header first so an unchanged frame can
+        # be detected before the timestamp moves on
+        self._buf.clear()
+        self._buf.extend(self._render_queue_overview(statistics))
+        self._buf.extend(self._render_doctor_queues(doctor_queues))
+        self._buf.extend(self._render_patient_queue(
+            patient_queue, self.max_patient_rows, total=statistics['waiting']
+        ))
         
         if recommendations:
-            self.display_recommendations(recommendations)
+            self._buf.extend(self._render_recommendations(recommendations))
+        if footer:
+            self._buf.append(footer)
+        
+        body = "\n".join(self._buf).split("\n")
+        header_rows = len(self._render_header())
+        fits = self.is_tty and header_rows + len(body) < shutil.get_terminal_size().lines
+        if fits and self._prev_lines and self._prev_lines[header_rows:] == body:
+            return True
+        
+        self.last_update = datetime.now()
+        frame = self._render_header() + body
+        
+        # Diff against the previous frame only while it is still on screen
+        # and fits without scrolling; otherwise redraw everything
+        if fits and self._prev_lines:
+            self._write_diff(frame)
+        else:
+            self.clear_screen()
+            self._write(frame)
+        self._prev_lines = frame
+        return fits
     
     def display_welcome_screen(self):
         """Display welcome screen"""
         self.clear_screen()
-        print("\n" * 3)
-        print("=" * 80)
-        print(" " * 20 + "WELCOME TO JAYANAGAR SPECIALTY CLINIC")
-        print(" " * 15 + "Patient Flow Management System v1.0")
-        print("=" * 80)
-        print("\n" * 2)
-        print("Features:")
-        print("  ✓ Smart Patient Registration")
-        print("  ✓ AI-Powered Wait Time Predictions")
-        print("  ✓ Real-Time Queue Updates")
-        print("  ✓ Doctor Load Balancing")
-        print("  ✓ SMS Notifications (Simulated)")
-        print("\n" * 2)
-        print("=" * 80)
-    
-    def animate_loading(self, message: str, duration: int = 2):
-        """Display loading animation"""
+        self._write([
+            "\n" * 3,
+            _DHR,
+            " " * 20 + "WELCOME TO JAYANAGAR SPECIALTY CLINIC",
+            " " * 15 + "Patient Flow Management System v1.0",
+            _DHR,
+            "\n" * 2,
+            "Features:",
+            "  ✓ Smart Patient Registration",
+            "  ✓ AI-Powered Wait Time Predictions",
+            "  ✓ Real-Time Queue Updates",
+            "  ✓ Doctor Load Balancing",
+            "  ✓ SMS Notifications (Simulated)",
+            "\n" * 2,
+            _DHR
+        ])
+    
+    @contextmanager
+    def animate_loading(self, message: str):
+        """Display a loading animation while the wrapped block runs
+        
+        The spinner rewrites the current line, so the block should not print;
+        report its results after the with statement instead.
+        """
+        if not self.is_tty:
+            # No animation when output is redirected, just the completion line
+            yield
+            print(f"{message} ✓")
+            return
+        
+        stop_event = threading.Event()
+        spinner = threading.Thread(target=self._spin, args=(message, stop_event), daemon=True)
+        spinner.start()
+        try:
+            yield
+        finally:
+            stop_event.set()
+            spinner.join()
+        
+        print(f"\r{message} ✓")
+    
+    def _spin(self, message: str, stop_event: threading.Event):
+        """Spinner loop run on a background thread until stop_event is set"""
         animation = ["|", "/", "-", "\\"]
-        end_time = time.time() + duration
         i = 0
         
-        while time.time() < end_time:
+        while not stop_event.is_set():
             print(f"\r{message} {animation[i % len(animation)]}", end="", flush=True)
-            time.sleep(0.1)
+            stop_event.wait(0.1)
             i += 1
-        
-        print(f"\r{message} ✓")
 
 
 class NotificationService:
     """Simulates SMS/notification service"""
     
-    def __init__(self):
-        self.notifications_sent = []
+    def __init__(self, max_history: int = 1000, batch_window: float = 2.0,
+                 max_pending: int = 50):
+        # Only the most recent max_history notifications are kept; total_sent
+        # keeps counting every delivered notification past that cap
+        self.notifications_sent: Deque[Dict] = deque(maxlen=max_history)
+        self.total_sent = 0
+        
+        # Wait time updates are batched: within batch_window seconds only the
+        # latest update per patient is kept, and the batch is delivered when
+        # the window has passed or max_pending patients are waiting on one
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self._pending: Dict[str, Dict] = {}  # patient_id -> latest wait time update
+        self._last_flush = time.monotonic()
     
     def send_wait_time_notification(self, patient_id: str, wait_time: float):
         """Send wait time notification to patient"""
@@ -163,9 +319,25 @@ class NotificationService:
             'message': f"Your estimated wait time is {wait_time:.0f} minutes",
             'timestamp': datetime.now()
         }
-        self.notifications_sent.append(notification)
+        # Re-insert so the batch stays ordered by each patient's latest update
+        self._pending.pop(patient_id, None)
+        self._pending[patient_id] = notification
+        self._maybe_flush()
         return notification
     
+    def _maybe_flush(self):
+        """Deliver pending updates if the batch window or size limit is reached"""
+        if (len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.batch_window):
+            self.flush()
+    
+    def flush(self):
+        """Deliver all pending wait time updates"""
+        self.notifications_sent.extend(self._pending.values())
+        self.total_sent += len(self._pending)
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+    
     def send_ready_notification(self, patient_id: str):
         """Send ready notification to patient"""
         notification = {
@@ -174,7 +346,9 @@ class NotificationService:
             'message': "The doctor is ready to see you now. Please proceed to the consultation room.",
             'timestamp': datetime.now()
         }
+        self.flush()  # keep earlier wait time updates ahead of this one
         self.notifications_sent.append(notification)
+        self.total_sent += 1
         return notification
     
     def send_queue_update(self, patient_id: str, position: int):
@@ -185,9 +359,15 @@ class NotificationService:
             'message': f"You are now #{position} in the queue",
             'timestamp': datetime.now()
         }
+        self.flush()  # keep earlier wait time updates ahead of this one
         self.notifications_sent.append(notification)
+        self.total_sent += 1
         return notification
     
-    def get_notification_history(self) -> List[Dict]:
-        """Get all sent notifications"""
-        return self.notifications_sent
+    def get_notification_history(self, last_n: Optional[int] = None) -> List[Dict]:
+        """Get sent notifications, optionally only the last_n most recent"""
+        self.flush()
+        if last_n is None:
+            return list(self.notifications_sent)
+        start = max(0, len(self.notifications_sent) - last_n)
+        return list(islice(self.notifications_sent, start, None))
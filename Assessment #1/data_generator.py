@@ -5,129 +5,181 @@ Generates synthetic historical appointment data for training and testing
 
 import pandas as pd
 import numpy as np
+import os
 from datetime import datetime, timedelta
-import random
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain NumPy
+    njit = None
+
+
+SPECIALTIES = ['Cardiology', 'Orthopedics', 'Dermatology', 'Pediatrics', 'General Medicine']
+
+
+def _gen_delays_loop(doctor_ids, hours, avg_consult, variance,
+                     base_rand, peak_rand, queue_rand, consult_rand):
+    """Compute delay and consultation time per patient in a single fused pass"""
+    n = doctor_ids.shape[0]
+    total_delay = np.empty(n)
+    consultation_time = np.empty(n)
+    
+    for i in range(n):
+        delay = base_rand[i] + queue_rand[i]
+        if 17 <= hours[i] < 20:
+            delay += peak_rand[i]
+        total_delay[i] = max(0.0, delay)
+        
+        d = doctor_ids[i] - 1
+        consultation_time[i] = max(5.0, avg_consult[d] + variance[d] * consult_rand[i])
+    
+    return total_delay, consultation_time
+
+
+def _gen_delays_numpy(doctor_ids, hours, avg_consult, variance,
+                      base_rand, peak_rand, queue_rand, consult_rand):
+    """Vectorized equivalent of _gen_delays_loop used when numba is unavailable"""
+    is_peak = (hours >= 17) & (hours < 20)
+    total_delay = np.maximum(0, base_rand + np.where(is_peak, peak_rand, 0) + queue_rand)
+    
+    d = doctor_ids - 1
+    consultation_time = np.maximum(5, avg_consult[d] + variance[d] * consult_rand)
+    
+    return total_delay, consultation_time
+
+
+if njit is not None:
+    _gen_delays = njit(cache=True, fastmath=True)(_gen_delays_loop)
+else:
+    _gen_delays = _gen_delays_numpy
 
 
 class AppointmentDataGenerator:
     """Generates synthetic appointment data for the clinic"""
     
     def __init__(self, num_doctors: int = 15, seed: int = 42):
-        random.seed(seed)
-        np.random.seed(seed)
+        self._rng = np.random.default_rng(seed)
         self.num_doctors = num_doctors
         
-        # Doctor profiles with varying consultation times
-        self.doctor_profiles = {
-            i: {
-                'avg_consultation_time': random.uniform(8, 22),
-                'variance': random.uniform(2, 5),
-                'specialty': random.choice(['Cardiology', 'Orthopedics', 'Dermatology', 
-                                          'Pediatrics', 'General Medicine'])
+        # Doctor profiles with varying consultation times, stored as arrays
+        # indexed by doctor_id - 1 so they can be fancy-indexed per patient
+        self._avg_consult = self._rng.uniform(8, 22, num_doctors)
+        self._variance = self._rng.uniform(2, 5, num_doctors)
+        self._specialty_idx = self._rng.integers(0, len(SPECIALTIES), num_doctors, dtype=np.int8)
+        self._specialties = list(SPECIALTIES)
+        self._doctor_profiles = None
+    
+    @property
+    def doctor_profiles(self) -> dict:
+        """Doctor profiles keyed by doctor_id (built on first access)"""
+        if self._doctor_profiles is None:
+            self._doctor_profiles = {
+                i + 1: {
+                    'avg_consultation_time': float(self._avg_consult[i]),
+                    'variance': float(self._variance[i]),
+                    'specialty': self._specialties[self._specialty_idx[i]]
+                }
+                for i in range(self.num_doctors)
             }
-            for i in range(1, num_doctors + 1)
-        }
+        return self._doctor_profiles
     
     def generate_historical_data(self, start_date: datetime, end_date: datetime, 
                                 patients_per_day: int = 300) -> pd.DataFrame:
         """Generate historical appointment data"""
-        records = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            # Generate appointments for the day
-            daily_records = self._generate_daily_appointments(current_date, patients_per_day)
-            records.extend(daily_records)
-            current_date += timedelta(days=1)
-        
-        df = pd.DataFrame(records)
+        # Generate every day in one batch
+        num_days = max(0, (end_date - start_date).days + 1)
+        df = self._generate_daily_appointments(start_date, patients_per_day, num_days)
         return df
     
-    def _generate_daily_appointments(self, date: datetime, total_patients: int) -> list:
-        """Generate appointments for a single day"""
-        records = []
-        
+    def _generate_daily_appointments(self, date: datetime, total_patients: int,
+                                     num_days: int = 1) -> pd.DataFrame:
+        """Generate appointments for num_days consecutive days starting at date"""
         # Peak hours: 5-8 PM (75% of patients)
         peak_patients = int(total_patients * 0.75)
         non_peak_patients = total_patients - peak_patients
         
-        # Generate non-peak appointments (9 AM - 5 PM)
-        records.extend(self._generate_time_slot_appointments(
-            date, 9, 17, non_peak_patients
-        ))
-        
-        # Generate peak appointments (5 PM - 8 PM)
-        records.extend(self._generate_time_slot_appointments(
-            date, 17, 20, peak_patients
-        ))
-        
-        return records
+        df = pd.concat([
+            # Non-peak appointments (9 AM - 5 PM)
+            self._generate_time_slot_appointments(date, 9, 17, non_peak_patients, num_days),
+            # Peak appointments (5 PM - 8 PM)
+            self._generate_time_slot_appointments(date, 17, 20, peak_patients, num_days)
+        ])
+        df = df.sort_values('scheduled_time', kind='stable', ignore_index=True)
+        df.insert(0, 'patient_id', [f"P{i:05d}" for i in range(len(df))])
+        return df
     
     def _generate_time_slot_appointments(self, date: datetime, start_hour: int, 
-                                        end_hour: int, num_patients: int) -> list:
-        """Generate appointments for a specific time slot"""
-        records = []
+                                        end_hour: int, num_patients: int,
+                                        num_days: int = 1) -> pd.DataFrame:
+        """Generate appointments for a specific time slot on num_days consecutive days"""
+        size = num_patients * num_days
         
-        for _ in range(num_patients):
-            # Random doctor
-            doctor_id = random.randint(1, self.num_doctors)
-            doctor_profile = self.doctor_profiles[doctor_id]
-            
-            # Random scheduled time within the slot
-            hour = random.randint(start_hour, end_hour - 1)
-            minute = random.choice([0, 15, 30, 45])
-            scheduled_time = date.replace(hour=hour, minute=minute, second=0)
-            
-            # Calculate actual time with delays
-            base_delay = random.gauss(5, 10)  # Base delay in minutes
-            
-            # Peak hour additional delay
-            if 17 <= hour < 20:
-                peak_delay = random.gauss(15, 10)
-                base_delay += peak_delay
-            
-            # Queue-based delay (simulate backlog)
-            queue_factor = random.randint(0, 5)
-            queue_delay = queue_factor * random.uniform(5, 15)
-            
-            total_delay = max(0, base_delay + queue_delay)
-            
-            # Consultation time
-            consultation_time = random.gauss(
-                doctor_profile['avg_consultation_time'],
-                doctor_profile['variance']
-            )
-            consultation_time = max(5, consultation_time)  # Minimum 5 minutes
-            
-            actual_time = scheduled_time + timedelta(minutes=total_delay + consultation_time)
-            
-            # Current queue length at appointment time
-            queue_length = random.randint(0, 8) if 17 <= hour < 20 else random.randint(0, 3)
-            
-            records.append({
-                'patient_id': f"P{len(records):05d}",
-                'doctor_id': doctor_id,
-                'scheduled_time': scheduled_time,
-                'actual_time': actual_time,
-                'queue_length': queue_length,
-                'avg_consultation_time': doctor_profile['avg_consultation_time'],
-                'specialty': doctor_profile['specialty']
-            })
+        # Random doctor and scheduled time within the slot
+        doctor_ids = self._rng.integers(1, self.num_doctors + 1, size)
+        day_offsets = np.arange(num_days).repeat(num_patients)
+        hours = self._rng.integers(start_hour, end_hour, size)
+        minutes = self._rng.choice([0, 15, 30, 45], size)
+        first_day = np.datetime64(date.replace(hour=0, minute=0, second=0, microsecond=0), 'ns')
+        scheduled_time = (first_day + day_offsets * np.timedelta64(1, 'D')
+                          + hours * np.timedelta64(1, 'h') + minutes * np.timedelta64(1, 'm'))
         
-        return records
+        # Base delay in minutes, additional delay during peak hours,
+        # queue-based delay (simulated backlog) and consultation time noise
+        base_rand = self._rng.normal(5, 10, size)
+        peak_rand = self._rng.normal(15, 10, size)
+        queue_rand = self._rng.integers(0, 6, size) * self._rng.uniform(5, 15, size)
+        consult_rand = self._rng.standard_normal(size)
+        
+        total_delay, consultation_time = _gen_delays(
+            doctor_ids, hours, self._avg_consult, self._variance,
+            base_rand, peak_rand, queue_rand, consult_rand
+        )
+        doctor_idx = doctor_ids - 1
+        
+        actual_time = scheduled_time + pd.to_timedelta(total_delay + consultation_time, unit='m')
+        
+        # Current queue length at appointment time
+        is_peak = (hours >= 17) & (hours < 20)
+        queue_length = np.where(is_peak,
+                                self._rng.integers(0, 9, size),
+                                self._rng.integers(0, 4, size))
+        
+        return pd.DataFrame({
+            'doctor_id': doctor_ids,
+            'scheduled_time': scheduled_time,
+            'actual_time': actual_time,
+            'queue_length': queue_length,
+            'avg_consultation_time': self._avg_consult[doctor_idx],
+            'specialty': pd.Categorical.from_codes(self._specialty_idx[doctor_idx],
+                                                   categories=self._specialties)
+        })
     
     def generate_and_save(self, filepath: str, months: int = 3, 
-                         patients_per_day: int = 300):
-        """Generate and save appointment data to CSV"""
+                         patients_per_day: int = 300, verbose: bool = True):
+        """Generate and save appointment data to CSV (plus a Parquet copy if possible)
+        
+        Set verbose=False to suppress the progress messages, e.g. while a
+        loading spinner owns the terminal line.
+        """
         end_date = datetime.now()
         start_date = end_date - timedelta(days=months * 30)
         
         df = self.generate_historical_data(start_date, end_date, patients_per_day)
         df.to_csv(filepath, index=False)
         
-        print(f"Generated {len(df)} appointment records")
-        print(f"Date range: {start_date.date()} to {end_date.date()}")
-        print(f"Saved to: {filepath}")
+        if verbose:
+            print(f"Generated {len(df)} appointment records")
+            print(f"Date range: {start_date.date()} to {end_date.date()}")
+            print(f"Saved to: {filepath}")
+        
+        # Parquet loads much faster and keeps datetimes typed, but needs pyarrow
+        parquet_path = os.path.splitext(filepath)[0] + '.parquet'
+        try:
+            df.to_parquet(parquet_path, index=False)
+            if verbose:
+                print(f"Saved to: {parquet_path}")
+        except ImportError:
+            pass
         
         return df
     
@@ -145,5 +197,8 @@ if __name__ == "__main__":
     print("\n=== Data Statistics ===")
     print(f"Total appointments: {len(df)}")
     print(f"Date range: {df['scheduled_time'].min()} to {df['scheduled_time'].max()}")
-    print(f"\nPeak hour appointments (5-8 PM): {len(df[pd.to_datetime(df['scheduled_time']).dt.hour >= 17])}")
-    print(f"Non-peak appointments: {len(df[pd.to_datetime(df['scheduled_time']).dt.hour < 17])}")
+    
+    # scheduled_time is already datetime64, so no re-parsing is needed
+    peak = (df['scheduled_time'].dt.hour >= 17).sum()
+    print(f"\nPeak hour appointments (5-8 PM): {peak}")
+    print(f"Non-peak appointments: {len(df) - peak}")
@@ -113,12 +113,11 @@ def demo_system():
     
     # Complete first 2 consultations
     completed_count = 0
-    for patient_id, patient in system.queue.all_patients.items():
-        if patient.status == "in_consultation" and completed_count < 2:
-            system.complete_patient(patient_id)
-            print(f"✓ Completed consultation for {patient.name} (ID: {patient_id})")
-            completed_count += 1
-            time.sleep(1)
+    for patient in system.queue.get_patients_in_consultation()[:2]:
+        system.complete_patient(patient.patient_id)
+        print(f"✓ Completed consultation for {patient.name} (ID: {patient.patient_id})")
+        completed_count += 1
+        time.sleep(1)
     
     print(f"\nConsultations completed: {completed_count}")
     time.sleep(2)
@@ -141,10 +140,10 @@ def demo_system():
     print("DEMO 7: NOTIFICATION HISTORY")
     print("=" * 80)
     
-    notifications = system.notification_service.get_notification_history()
-    print(f"\nTotal notifications sent: {len(notifications)}")
+    notifications = system.notification_service.get_notification_history(last_n=5)
+    print(f"\nTotal notifications sent: {system.notification_service.total_sent}")
     print("\nRecent notifications:")
-    for notif in notifications[-5:]:
+    for notif in notifications:
         print(f"  [{notif['type'].upper()}] Patient {notif['patient_id']}: {notif['message'][:60]}...")
     
     time.sleep(2)
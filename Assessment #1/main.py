@@ -5,14 +5,26 @@ Integrates all modules and provides CLI interface
 
 import sys
 import os
+import asyncio
+import heapq
+import threading
 from datetime import datetime, timedelta
 from patient_queue import Patient, PatientQueue
 from predictive_model import WaitTimePredictionModel, DoctorProfileManager
-from data_generator import AppointmentDataGenerator
 from dashboard import Dashboard, NotificationService
-import pandas as pd
 import time
 
+# Screen headers, built once rather than on every menu action
+_DHR = "=" * 80
+_FOOTER = "\n" + _DHR
+_MENU_BANNER = f"\n{_DHR}\n{' ' * 25}MAIN MENU\n{_DHR}"
+_REGISTRATION_BANNER = f"\n{_DHR}\n{' ' * 25}PATIENT REGISTRATION\n{_DHR}"
+_START_BANNER = f"\n{_DHR}\n{' ' * 25}START CONSULTATION\n{_DHR}"
+_COMPLETE_BANNER = f"\n{_DHR}\n{' ' * 25}COMPLETE CONSULTATION\n{_DHR}"
+_PATIENT_INFO_BANNER = f"\n{_DHR}\n{' ' * 25}PATIENT INFORMATION\n{_DHR}"
+_REPORT_BANNER = f"\n{_DHR}\n{' ' * 25}SYSTEM REPORT\n{_DHR}"
+_NOTIFICATIONS_BANNER = f"\n{_DHR}\n{' ' * 25}NOTIFICATION HISTORY\n{_DHR}"
+
 
 class PatientFlowManagementSystem:
     """Main system coordinating all components"""
@@ -23,14 +35,18 @@ class PatientFlowManagementSystem:
         self.doctor_manager = DoctorProfileManager()
         self.dashboard = Dashboard()
         self.notification_service = NotificationService()
+        self.dashboard_refresh_interval = 2.0  # seconds between live dashboard redraws
         self.is_initialized = False
     
     def initialize_system(self):
         """Initialize system with doctors and train prediction model"""
+        # Only needed here, and slow to import, so kept out of CLI startup
+        import pandas as pd
+        from data_generator import AppointmentDataGenerator
+        
         print("Initializing Patient Flow Management System...")
         
         # Initialize doctors (15 specialists)
-        self.dashboard.animate_loading("Loading doctor profiles", 1)
         doctors = [
             (1, "Dr. Sharma", "Cardiology", 12.5),
             (2, "Dr. Patel", "Orthopedics", 18.0),
@@ -49,20 +65,29 @@ class PatientFlowManagementSystem:
             (15, "Dr. Pillai", "General Medicine", 12.5),
         ]
         
-        for doctor in doctors:
-            self.doctor_manager.add_doctor(*doctor)
+        with self.dashboard.animate_loading("Loading doctor profiles"):
+            for doctor in doctors:
+                self.doctor_manager.add_doctor(*doctor)
         
         # Generate training data if not exists
         data_file = "appointments.csv"
+        parquet_file = "appointments.parquet"
         if not os.path.exists(data_file):
-            self.dashboard.animate_loading("Generating historical appointment data", 2)
-            generator = AppointmentDataGenerator(num_doctors=15)
-            generator.generate_and_save(data_file, months=3)
+            with self.dashboard.animate_loading("Generating historical appointment data"):
+                generator = AppointmentDataGenerator(num_doctors=15)
+                generated = generator.generate_and_save(data_file, months=3, verbose=False)
+            # Reported after the spinner has finished its line
+            print(f"  - Generated {len(generated)} appointment records, saved to {data_file}")
         
         # Train prediction model
-        self.dashboard.animate_loading("Training AI prediction model", 2)
-        df = pd.read_csv(data_file)
-        metrics = self.predictor.train(df)
+        with self.dashboard.animate_loading("Training AI prediction model"):
+            # Prefer the Parquet copy unless the CSV has been replaced since
+            if (os.path.exists(parquet_file)
+                    and os.path.getmtime(parquet_file) >= os.path.getmtime(data_file)):
+                df = pd.read_parquet(parquet_file)
+            else:
+                df = pd.read_csv(data_file, parse_dates=['scheduled_time', 'actual_time'])
+            metrics = self.predictor.train(df)
         
         print(f"\nModel trained successfully!")
         print(f"  - Mean Absolute Error: {metrics['mae']:.2f} minutes")
@@ -106,15 +131,20 @@ class PatientFlowManagementSystem:
         
         return patient
     
-    def get_dashboard_data(self):
-        """Prepare data for dashboard display"""
+    def get_dashboard_data(self, patient_limit: int = None):
+        """Prepare data for dashboard display
+        
+        If patient_limit is given, only that many waiting patients (those with
+        the shortest predicted wait) are returned.
+        """
         # Get statistics
         statistics = self.queue.get_statistics()
         
         # Get doctor queue info
+        queue_lengths = self.queue.queue_lengths()
         doctor_queues = []
         for doctor_id, profile in self.doctor_manager.doctor_profiles.items():
-            queue_length = self.queue.get_queue_length(doctor_id)
+            queue_length = queue_lengths.get(doctor_id, 0)
             avg_wait = queue_length * profile['avg_consultation_time']
             status = self.queue.doctors_status.get(doctor_id, "available")
             
@@ -130,17 +160,19 @@ class PatientFlowManagementSystem:
         doctor_queues.sort(key=lambda x: x['queue_length'], reverse=True)
         
         # Get waiting patients
-        waiting_patients = self.queue.get_waiting_patients()
         patient_data = []
         
-        for patient in waiting_patients:
-            position = self.queue.get_queue_position(patient.patient_id)
+        for patient, position in self.queue.iter_waiting_with_position():
             patient_dict = patient.to_dict()
             patient_dict['position'] = position
             patient_data.append(patient_dict)
         
-        # Sort by predicted wait time
-        patient_data.sort(key=lambda x: x.get('predicted_wait_time', 0))
+        # Sort by predicted wait time, selecting just the head when limited
+        if patient_limit is not None:
+            patient_data = heapq.nsmallest(patient_limit, patient_data,
+                                           key=lambda x: x.get('predicted_wait_time', 0))
+        else:
+            patient_data.sort(key=lambda x: x.get('predicted_wait_time', 0))
         
         # Generate recommendations
         recommendations = self._generate_recommendations(doctor_queues, statistics)
@@ -151,11 +183,19 @@ class PatientFlowManagementSystem:
         """Generate system recommendations"""
         recommendations = []
         
+        # Find the longest/shortest queues and count high wait times in one pass
+        max_queue = min_queue = doctor_queues[0] if doctor_queues else None
+        high_wait_count = 0
+        for d in doctor_queues:
+            if d['queue_length'] > max_queue['queue_length']:
+                max_queue = d
+            elif d['queue_length'] < min_queue['queue_length']:
+                min_queue = d
+            if d['avg_wait_time'] > 40:
+                high_wait_count += 1
+        
         # Check for load imbalance
-        if len(doctor_queues) > 0:
-            max_queue = max(doctor_queues, key=lambda x: x['queue_length'])
-            min_queue = min(doctor_queues, key=lambda x: x['queue_length'])
-            
+        if max_queue is not None:
             if max_queue['queue_length'] - min_queue['queue_length'] > 3:
                 recommendations.append(
                     f"Consider redirecting patients from Dr. {max_queue['doctor_id']} "
@@ -164,10 +204,9 @@ class PatientFlowManagementSystem:
                 )
         
         # Check for high wait times
-        high_wait_doctors = [d for d in doctor_queues if d['avg_wait_time'] > 40]
-        if high_wait_doctors:
+        if high_wait_count:
             recommendations.append(
-                f"{len(high_wait_doctors)} doctor(s) have wait times exceeding 40 minutes. "
+                f"{high_wait_count} doctor(s) have wait times exceeding 40 minutes. "
                 "Consider adding support staff or extending hours."
             )
         
@@ -195,13 +234,71 @@ class PatientFlowManagementSystem:
         """Mark patient consultation as complete"""
         self.queue.complete_consultation(patient_id)
     
-    def interactive_menu(self):
+    def refresh_predictions(self):
+        """Re-predict wait times for every waiting patient in one batch"""
+        waiting = list(self.queue.iter_waiting_with_position())
+        if not waiting:
+            return
+        
+        predictions = self.predictor.batch_predict([
+            {
+                'doctor_id': patient.doctor_id,
+                'scheduled_time': patient.appointment_time,
+                'queue_length': position,
+                'avg_consultation_time': self.doctor_manager.get_avg_consultation_time(patient.doctor_id)
+            }
+            for patient, position in waiting
+        ])
+        
+        for (patient, _), predicted_wait in zip(waiting, predictions):
+            patient.predicted_wait_time = predicted_wait
+    
+    async def _background_refresh(self, interval: float):
+        """Keep wait time predictions current while the menu waits for input"""
+        while True:
+            await asyncio.sleep(interval)
+            self.refresh_predictions()
+    
+    async def _input(self, prompt: str) -> str:
+        """Read a line on a worker thread so background tasks keep running
+        
+        The reader is a daemon thread rather than the default executor: on
+        Ctrl+C, asyncio.run joins executor threads during shutdown and would
+        hang until the blocked input() returned.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def resolve(set_outcome, value):
+            if not future.done():  # the awaiting task may have been cancelled
+                set_outcome(value)
+        
+        def read():
+            try:
+                outcome = (future.set_result, input(prompt))
+            except Exception as exc:  # e.g. EOFError when stdin closes
+                outcome = (future.set_exception, exc)
+            try:
+                loop.call_soon_threadsafe(resolve, *outcome)
+            except RuntimeError:
+                pass  # loop already closed
+        
+        threading.Thread(target=read, daemon=True).start()
+        return (await future).strip()
+    
+    async def interactive_menu(self, refresh_interval: float = 30.0):
         """Display interactive CLI menu"""
+        refresh_task = asyncio.create_task(self._background_refresh(refresh_interval))
+        try:
+            await self._menu_loop()
+        finally:
+            refresh_task.cancel()
+    
+    async def _menu_loop(self):
+        """Show the main menu and dispatch choices until the user exits"""
         while True:
             self.dashboard.clear_screen()
-            print("\n" + "=" * 80)
-            print(" " * 25 + "MAIN MENU")
-            print("=" * 80)
+            print(_MENU_BANNER)
             print("\n1. Register New Patient")
             print("2. View Dashboard")
             print("3. Start Consultation (Doctor)")
@@ -210,43 +307,41 @@ class PatientFlowManagementSystem:
             print("6. Generate Detailed Report")
             print("7. View Notifications")
             print("8. Exit")
-            print("\n" + "=" * 80)
+            print(_FOOTER)
             
-            choice = input("\nEnter your choice (1-8): ").strip()
+            choice = await self._input("\nEnter your choice (1-8): ")
             
             if choice == "1":
-                self._register_patient_interactive()
+                await self._register_patient_interactive()
             elif choice == "2":
-                self._view_dashboard_interactive()
+                await self._view_dashboard_interactive()
             elif choice == "3":
-                self._start_consultation_interactive()
+                await self._start_consultation_interactive()
             elif choice == "4":
-                self._complete_consultation_interactive()
+                await self._complete_consultation_interactive()
             elif choice == "5":
-                self._view_patient_info_interactive()
+                await self._view_patient_info_interactive()
             elif choice == "6":
-                self._generate_report()
+                await self._generate_report()
             elif choice == "7":
-                self._view_notifications()
+                await self._view_notifications()
             elif choice == "8":
                 print("\nThank you for using Patient Flow Management System!")
                 print("Goodbye!\n")
                 break
             else:
                 print("\nInvalid choice. Please try again.")
-                time.sleep(1)
+                await asyncio.sleep(1)
     
-    def _register_patient_interactive(self):
+    async def _register_patient_interactive(self):
         """Interactive patient registration"""
         self.dashboard.clear_screen()
-        print("\n" + "=" * 80)
-        print(" " * 25 + "PATIENT REGISTRATION")
-        print("=" * 80)
+        print(_REGISTRATION_BANNER)
         
-        name = input("\nEnter patient name: ").strip()
+        name = await self._input("\nEnter patient name: ")
         if not name:
             print("Invalid name. Registration cancelled.")
-            time.sleep(2)
+            await asyncio.sleep(2)
             return
         
         print("\nAvailable Doctors:")
@@ -255,7 +350,7 @@ class PatientFlowManagementSystem:
             print(f"  {doctor_id}. Dr. {profile['name']} - {profile['specialty']} "
                   f"(Queue: {queue_len}, Avg: {profile['avg_consultation_time']:.1f}min)")
         
-        doctor_input = input("\nEnter doctor ID (or press Enter for auto-assignment): ").strip()
+        doctor_input = await self._input("\nEnter doctor ID (or press Enter for auto-assignment): ")
         doctor_id = int(doctor_input) if doctor_input.isdigit() else None
         
         patient = self.register_new_patient(name, doctor_id)
@@ -264,25 +359,44 @@ class PatientFlowManagementSystem:
         self.dashboard.display_patient_info(patient.to_dict())
         print(f"\n📱 SMS sent to patient: Your estimated wait time is {patient.predicted_wait_time:.0f} minutes")
         
-        input("\nPress Enter to continue...")
+        await self._input("\nPress Enter to continue...")
     
-    def _view_dashboard_interactive(self):
-        """Display dashboard in interactive mode"""
-        statistics, doctor_queues, patient_data, recommendations = self.get_dashboard_data()
-        self.dashboard.display_full_dashboard(statistics, doctor_queues, patient_data, recommendations)
-        input("\nPress Enter to return to menu...")
+    async def _view_dashboard_interactive(self):
+        """Display dashboard in interactive mode, kept live until Enter is pressed"""
+        live = self._draw_dashboard()
+        reply = asyncio.ensure_future(self._input(""))
+        
+        # Redraw periodically only while the frame fits on the terminal, so
+        # each refresh rewrites just the changed rows; a taller frame would
+        # have to be cleared and reprinted every time, so it is drawn once
+        while live and not reply.done():
+            await asyncio.wait({reply}, timeout=self.dashboard_refresh_interval)
+            if not reply.done():
+                live = self._draw_dashboard()
+        await reply
+    
+    def _draw_dashboard(self) -> bool:
+        """Draw the full dashboard with the return-to-menu prompt below it
+        
+        Returns True if the dashboard can be redrawn in place.
+        """
+        statistics, doctor_queues, patient_data, recommendations = self.get_dashboard_data(
+            patient_limit=self.dashboard.max_patient_rows
+        )
+        return self.dashboard.display_full_dashboard(
+            statistics, doctor_queues, patient_data, recommendations,
+            footer="\nPress Enter to return to menu..."
+        )
     
-    def _start_consultation_interactive(self):
+    async def _start_consultation_interactive(self):
         """Start consultation interactively"""
         self.dashboard.clear_screen()
-        print("\n" + "=" * 80)
-        print(" " * 25 + "START CONSULTATION")
-        print("=" * 80)
+        print(_START_BANNER)
         
-        doctor_id = input("\nEnter doctor ID: ").strip()
+        doctor_id = await self._input("\nEnter doctor ID: ")
         if not doctor_id.isdigit():
             print("Invalid doctor ID.")
-            time.sleep(2)
+            await asyncio.sleep(2)
             return
         
         patient = self.simulate_consultation(int(doctor_id))
@@ -292,101 +406,109 @@ class PatientFlowManagementSystem:
         else:
             print(f"\n✗ No waiting patients for Doctor {doctor_id}")
         
-        input("\nPress Enter to continue...")
+        await self._input("\nPress Enter to continue...")
     
-    def _complete_consultation_interactive(self):
+    async def _complete_consultation_interactive(self):
         """Complete consultation interactively"""
         self.dashboard.clear_screen()
-        print("\n" + "=" * 80)
-        print(" " * 25 + "COMPLETE CONSULTATION")
-        print("=" * 80)
+        print(_COMPLETE_BANNER)
+        
+        in_consultation = self.queue.get_patients_in_consultation()
+        if in_consultation:
+            print("\nCurrently in consultation:")
+            for patient in in_consultation:
+                print(f"  {patient.patient_id} - {patient.name} (Dr. {patient.doctor_id})")
         
-        patient_id = input("\nEnter patient ID: ").strip()
+        patient_id = await self._input("\nEnter patient ID: ")
         if patient_id in self.queue.all_patients:
             self.complete_patient(patient_id)
             print(f"\n✓ Consultation completed for Patient {patient_id}")
         else:
             print("\n✗ Patient not found")
         
-        input("\nPress Enter to continue...")
+        await self._input("\nPress Enter to continue...")
     
-    def _view_patient_info_interactive(self):
+    async def _view_patient_info_interactive(self):
         """View patient information interactively"""
         self.dashboard.clear_screen()
-        print("\n" + "=" * 80)
-        print(" " * 25 + "PATIENT INFORMATION")
-        print("=" * 80)
+        print(_PATIENT_INFO_BANNER)
         
-        patient_id = input("\nEnter patient ID: ").strip()
+        patient_id = await self._input("\nEnter patient ID: ")
         if patient_id in self.queue.all_patients:
             patient = self.queue.all_patients[patient_id]
             position = self.queue.get_queue_position(patient_id)
             patient_dict = patient.to_dict()
-            patient_dict['position'] = position
+            if position is not None:  # only waiting patients have a position
+                patient_dict['position'] = position
             self.dashboard.display_patient_info(patient_dict)
         else:
             print("\n✗ Patient not found")
         
-        input("\nPress Enter to continue...")
+        await self._input("\nPress Enter to continue...")
     
-    def _generate_report(self):
+    async def _generate_report(self):
         """Generate detailed system report"""
         self.dashboard.clear_screen()
         statistics, doctor_queues, patient_data, recommendations = self.get_dashboard_data()
         
-        print("\n" + "=" * 80)
-        print(" " * 25 + "SYSTEM REPORT")
-        print("=" * 80)
-        print(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("=" * 80)
+        # Build the whole report and write it in one go
+        out = [
+            _REPORT_BANNER,
+            f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            _DHR,
+        ]
         
         # Overall statistics
-        print("\n📊 Overall Statistics:")
+        out.append("\n📊 Overall Statistics:")
         for key, value in statistics.items():
-            print(f"  {key.replace('_', ' ').title()}: {value}")
+            out.append(f"  {key.replace('_', ' ').title()}: {value}")
         
         # Doctor performance
-        print("\n👨‍⚕️ Doctor Performance:")
+        out.append("\n👨‍⚕️ Doctor Performance:")
         for doc in doctor_queues[:5]:  # Top 5
-            print(f"  Dr. {doc['doctor_id']} ({doc['specialty']}): "
-                  f"{doc['queue_length']} waiting, {doc['avg_wait_time']:.1f}min avg wait")
+            out.append(f"  Dr. {doc['doctor_id']} ({doc['specialty']}): "
+                       f"{doc['queue_length']} waiting, {doc['avg_wait_time']:.1f}min avg wait")
         
         # Wait time analysis
         if patient_data:
             wait_times = [p.get('predicted_wait_time', 0) for p in patient_data]
             avg_wait = sum(wait_times) / len(wait_times)
             max_wait = max(wait_times)
-            print(f"\n⏱️ Wait Time Analysis:")
-            print(f"  Average: {avg_wait:.1f} minutes")
-            print(f"  Maximum: {max_wait:.1f} minutes")
+            out.append(f"\n⏱️ Wait Time Analysis:")
+            out.append(f"  Average: {avg_wait:.1f} minutes")
+            out.append(f"  Maximum: {max_wait:.1f} minutes")
         
         # Recommendations
-        print("\n💡 Recommendations:")
+        out.append("\n💡 Recommendations:")
         for i, rec in enumerate(recommendations, 1):
-            print(f"  {i}. {rec}")
+            out.append(f"  {i}. {rec}")
         
-        print("\n" + "=" * 80)
-        input("\nPress Enter to continue...")
+        out.append(_FOOTER)
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
+        await self._input("\nPress Enter to continue...")
     
-    def _view_notifications(self):
+    async def _view_notifications(self):
         """View notification history"""
         self.dashboard.clear_screen()
-        print("\n" + "=" * 80)
-        print(" " * 25 + "NOTIFICATION HISTORY")
-        print("=" * 80)
+        out = [
+            _NOTIFICATIONS_BANNER,
+        ]
         
-        notifications = self.notification_service.get_notification_history()
+        notifications = self.notification_service.get_notification_history(last_n=20)
         
         if not notifications:
-            print("\nNo notifications sent yet.")
+            out.append("\nNo notifications sent yet.")
         else:
-            for notif in notifications[-20:]:  # Last 20
-                print(f"\n[{notif['timestamp'].strftime('%H:%M:%S')}] {notif['type'].upper()}")
-                print(f"  Patient: {notif['patient_id']}")
-                print(f"  Message: {notif['message']}")
-        
-        print("\n" + "=" * 80)
-        input("\nPress Enter to continue...")
+            for notif in notifications:
+                out.append(f"\n[{notif['timestamp'].strftime('%H:%M:%S')}] {notif['type'].upper()}")
+                out.append(f"  Patient: {notif['patient_id']}")
+                out.append(f"  Message: {notif['message']}")
+        
+        out.append(_FOOTER)
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
+        await self._input("\nPress Enter to continue...")
 
 
 def main():
@@ -401,7 +523,7 @@ def main():
     system.initialize_system()
     
     # Run interactive menu
-    system.interactive_menu()
+    asyncio.run(system.interactive_menu())
 
 
 if __name__ == "__main__":
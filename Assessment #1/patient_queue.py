@@ -3,17 +3,26 @@ Patient Queue Management Module
 Handles patient registration, queue management, and real-time updates
 """
 
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import uuid
+from itertools import count, islice
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+
+# Source of default patient IDs: short, unique within a run and sortable
+_patient_seq = count(1)
 
 
 class Patient:
     """Represents a patient in the system"""
     
+    __slots__ = ('patient_id', 'name', 'doctor_id', 'appointment_time', 'arrival_time',
+                 'status', 'actual_consultation_time', 'predicted_wait_time',
+                 '_appointment_str', '_arrival_str')
+    
     def __init__(self, name: str, patient_id: str = None, doctor_id: int = None, 
                  appointment_time: datetime = None, arrival_time: datetime = None):
-        self.patient_id = patient_id or str(uuid.uuid4())[:8]
+        self.patient_id = patient_id or f"P{next(_patient_seq):08d}"
         self.name = name
         self.doctor_id = doctor_id
         self.appointment_time = appointment_time or datetime.now()
@@ -22,14 +31,18 @@ class Patient:
         self.actual_consultation_time = None
         self.predicted_wait_time = None
         
+        # Times are fixed after registration, so format them once
+        self._appointment_str = self.appointment_time.isoformat(sep=' ', timespec='seconds')
+        self._arrival_str = self.arrival_time.isoformat(sep=' ', timespec='seconds')
+        
     def to_dict(self) -> Dict:
         """Convert patient to dictionary"""
         return {
             'patient_id': self.patient_id,
             'name': self.name,
             'doctor_id': self.doctor_id,
-            'appointment_time': self.appointment_time.strftime('%Y-%m-%d %H:%M:%S'),
-            'arrival_time': self.arrival_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'appointment_time': self._appointment_str,
+            'arrival_time': self._arrival_str,
             'status': self.status,
             'predicted_wait_time': self.predicted_wait_time
         }
@@ -39,82 +52,146 @@ class PatientQueue:
     """Manages patient queues for multiple doctors"""
     
     def __init__(self):
-        self.queues: Dict[int, List[Patient]] = {}  # doctor_id -> list of patients
+        self.waiting: Dict[int, Deque[Patient]] = {}  # doctor_id -> waiting patients, FIFO
+        self.in_consult: Dict[int, Set[str]] = {}  # doctor_id -> ids of patients being seen
         self.all_patients: Dict[str, Patient] = {}  # patient_id -> patient
         self.doctors_status: Dict[int, str] = {}  # doctor_id -> status (available, busy)
         
+        # Positions are kept as per-doctor ticket numbers so lookups are O(1):
+        # position = ticket - tickets already served from the head + 1
+        self._index_in_queue: Dict[str, int] = {}  # patient_id -> ticket number
+        self._head_offset: Dict[int, int] = {}  # doctor_id -> tickets served
+        
+        # Running totals for get_statistics, updated on every status change
+        self._counts: Dict[str, int] = {'waiting': 0, 'in_consultation': 0, 'completed': 0}
+        self._busy_doctors = 0
+        
     def register_patient(self, patient: Patient) -> str:
-        """Register a new patient in the queue"""
-        self.all_patients[patient.patient_id] = patient
+        """Register a new patient in the queue
         
-        if patient.doctor_id not in self.queues:
-            self.queues[patient.doctor_id] = []
+        Registering an ID that is still waiting or in consultation does
+        nothing; a patient whose consultation is completed joins the queue again.
+        """
+        patient_id = patient.patient_id
+        previous = self.all_patients.get(patient_id)
+        if previous is not None:
+            if (patient_id in self._index_in_queue
+                    or patient_id in self.in_consult[previous.doctor_id]):
+                return patient_id
+            self._counts[previous.status] -= 1
+        
+        self.all_patients[patient_id] = patient
+        patient.status = "waiting"
+        
+        if patient.doctor_id not in self.waiting:
+            self.waiting[patient.doctor_id] = deque()
+            self.in_consult[patient.doctor_id] = set()
             self.doctors_status[patient.doctor_id] = "available"
-            
-        self.queues[patient.doctor_id].append(patient)
-        return patient.patient_id
+            self._head_offset[patient.doctor_id] = 0
+        
+        queue = self.waiting[patient.doctor_id]
+        self._index_in_queue[patient_id] = self._head_offset[patient.doctor_id] + len(queue)
+        queue.append(patient)
+        self._counts['waiting'] += 1
+        return patient_id
     
     def get_queue_position(self, patient_id: str) -> Optional[int]:
-        """Get the position of a patient in their doctor's queue"""
-        if patient_id not in self.all_patients:
+        """Get the position of a waiting patient in their doctor's queue"""
+        ticket = self._index_in_queue.get(patient_id)
+        if ticket is None:
             return None
-            
-        patient = self.all_patients[patient_id]
-        doctor_queue = self.queues.get(patient.doctor_id, [])
         
-        for i, p in enumerate(doctor_queue):
-            if p.patient_id == patient_id:
-                return i + 1
-        return None
+        patient = self.all_patients[patient_id]
+        return ticket - self._head_offset[patient.doctor_id] + 1
     
     def get_queue_length(self, doctor_id: int) -> int:
         """Get the current queue length for a doctor"""
-        return len([p for p in self.queues.get(doctor_id, []) if p.status == "waiting"])
+        return len(self.waiting.get(doctor_id, ()))
+    
+    def queue_lengths(self) -> Dict[int, int]:
+        """Get the current queue length for every doctor with a queue"""
+        return {doctor_id: len(queue) for doctor_id, queue in self.waiting.items()}
+    
+    def iter_waiting_with_position(self) -> Iterator[Tuple[Patient, int]]:
+        """Yield (patient, queue position) for every waiting patient"""
+        for queue in self.waiting.values():
+            for i, p in enumerate(queue, 1):
+                yield p, i
     
     def start_consultation(self, doctor_id: int) -> Optional[Patient]:
         """Start consultation with the next patient in queue"""
-        queue = self.queues.get(doctor_id, [])
+        queue = self.waiting.get(doctor_id)
+        if not queue:
+            return None
         
-        for patient in queue:
-            if patient.status == "waiting":
-                patient.status = "in_consultation"
-                patient.actual_consultation_time = datetime.now()
-                self.doctors_status[doctor_id] = "busy"
-                return patient
+        patient = queue.popleft()
+        self._head_offset[doctor_id] += 1
+        del self._index_in_queue[patient.patient_id]
         
-        return None
+        self.in_consult[doctor_id].add(patient.patient_id)
+        self._set_status(patient, "in_consultation")
+        patient.actual_consultation_time = datetime.now()
+        self._set_doctor_status(doctor_id, "busy")
+        return patient
     
     def complete_consultation(self, patient_id: str):
         """Mark a patient's consultation as completed"""
-        if patient_id in self.all_patients:
-            patient = self.all_patients[patient_id]
-            patient.status = "completed"
-            
-            # Check if doctor has more patients
-            if self.get_queue_length(patient.doctor_id) == 0:
-                self.doctors_status[patient.doctor_id] = "available"
+        patient = self.all_patients.get(patient_id)
+        if patient is None:
+            return
+        
+        if patient_id in self._index_in_queue:
+            self._remove_waiting(patient)
+        self.in_consult[patient.doctor_id].discard(patient_id)
+        self._set_status(patient, "completed")
+        
+        # Check if doctor has more patients
+        if self.get_queue_length(patient.doctor_id) == 0:
+            self._set_doctor_status(patient.doctor_id, "available")
+    
+    def _set_status(self, patient: Patient, status: str):
+        """Change a patient's status and keep the status counters in sync"""
+        self._counts[patient.status] -= 1
+        self._counts[status] += 1
+        patient.status = status
+    
+    def _set_doctor_status(self, doctor_id: int, status: str):
+        """Change a doctor's status and keep the busy-doctor counter in sync"""
+        self._busy_doctors += (status == "busy") - (self.doctors_status[doctor_id] == "busy")
+        self.doctors_status[doctor_id] = status
+    
+    def _remove_waiting(self, patient: Patient):
+        """Remove a patient from the middle of their doctor's queue"""
+        queue = self.waiting[patient.doctor_id]
+        position = self._index_in_queue.pop(patient.patient_id) - self._head_offset[patient.doctor_id]
+        del queue[position]
+        
+        # Everyone behind the removed patient moves up one place
+        for p in islice(queue, position, None):
+            self._index_in_queue[p.patient_id] -= 1
     
     def get_waiting_patients(self, doctor_id: Optional[int] = None) -> List[Patient]:
         """Get all waiting patients, optionally filtered by doctor"""
         if doctor_id is not None:
-            return [p for p in self.queues.get(doctor_id, []) if p.status == "waiting"]
+            return list(self.waiting.get(doctor_id, ()))
         
         all_waiting = []
-        for queue in self.queues.values():
-            all_waiting.extend([p for p in queue if p.status == "waiting"])
+        for queue in self.waiting.values():
+            all_waiting.extend(queue)
         return all_waiting
     
+    def get_patients_in_consultation(self, doctor_id: Optional[int] = None) -> List[Patient]:
+        """Get patients currently being seen, optionally filtered by doctor"""
+        if doctor_id is not None:
+            ids = sorted(self.in_consult.get(doctor_id, ()))
+        else:
+            ids = sorted(pid for seen in self.in_consult.values() for pid in seen)
+        return [self.all_patients[pid] for pid in ids]
+    
     def get_statistics(self) -> Dict:
         """Get queue statistics"""
-        total_patients = len(self.all_patients)
-        waiting = sum(1 for p in self.all_patients.values() if p.status == "waiting")
-        in_consultation = sum(1 for p in self.all_patients.values() if p.status == "in_consultation")
-        completed = sum(1 for p in self.all_patients.values() if p.status == "completed")
-        
         return {
-            'total_patients': total_patients,
-            'waiting': waiting,
-            'in_consultation': in_consultation,
-            'completed': completed,
-            'doctors_busy': sum(1 for status in self.doctors_status.values() if status == "busy")
+            'total_patients': len(self.all_patients),
+            **self._counts,
+            'doctors_busy': self._busy_doctors
         }
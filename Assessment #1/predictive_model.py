@@ -3,46 +3,81 @@ Predictive Analytics Module
 Forecasts patient wait times based on historical data and current queue length
 """
 
-import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, mean_squared_error
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
-import pickle
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import os
+from functools import lru_cache
+
+# pandas, scikit-learn and joblib take over a second to import, so they are
+# loaded inside the methods that need them and the CLI starts without them
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class WaitTimePredictionModel:
     """Predicts patient wait times using machine learning"""
     
     def __init__(self):
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+        self._model = None  # built on first use, see the model property
         self.is_trained = False
+        self.feature_importances: Dict[str, float] = {}  # filled on first get_feature_importance
+        self._held_out: Optional[Tuple[np.ndarray, np.ndarray]] = None  # (X_test, y_test)
         self.feature_columns = ['doctor_id', 'hour', 'day_of_week', 'queue_length', 'avg_consultation_time']
         
-    def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        # Patients sharing a doctor, hour and queue slot get the same delay, so
+        # the model call is memoized per instance on the feature tuple
+        self._predict_delay = lru_cache(maxsize=4096)(self._model_delay)
+        
+    @property
+    def model(self):
+        """The underlying regressor, created on first access"""
+        if self._model is None:
+            from sklearn.ensemble import HistGradientBoostingRegressor
+            self._model = HistGradientBoostingRegressor(
+                max_iter=200, max_depth=6, learning_rate=0.05, random_state=42
+            )
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+        # Results memoized or measured on the previous estimator no longer apply
+        self.clear_prediction_cache()
+        self.feature_importances = {}
+        self._held_out = None
+    
+    def prepare_features(self, data: 'pd.DataFrame') -> 'pd.DataFrame':
         """Prepare features from raw appointment data"""
-        # Extract time-based features
+        import pandas as pd
+        
+        # Extract time-based features with datetime64 arithmetic on the raw
+        # arrays rather than going through the .dt accessors
         data['scheduled_time'] = pd.to_datetime(data['scheduled_time'])
         data['actual_time'] = pd.to_datetime(data['actual_time'])
-        data['hour'] = data['scheduled_time'].dt.hour
-        data['day_of_week'] = data['scheduled_time'].dt.dayofweek
+        sched = data['scheduled_time'].to_numpy()
+        actual = data['actual_time'].to_numpy()
+        data['hour'] = sched.astype('datetime64[h]').astype(np.int64) % 24
+        # 1970-01-01 was a Thursday (Monday=0 -> 3)
+        data['day_of_week'] = (sched.astype('datetime64[D]').astype(np.int64) + 3) % 7
         
         # Calculate delays
-        data['delay'] = (data['actual_time'] - data['scheduled_time']).dt.total_seconds() / 60
+        data['delay'] = (actual - sched) / np.timedelta64(1, 'm')
         
         return data
     
-    def train(self, data: pd.DataFrame) -> Dict[str, float]:
+    def train(self, data: 'pd.DataFrame') -> Dict[str, float]:
         """Train the prediction model on historical data"""
+        from sklearn.metrics import mean_absolute_error, mean_squared_error
+        from sklearn.model_selection import train_test_split
+        
         # Prepare features
         data = self.prepare_features(data)
         
-        # Select features and target
-        X = data[self.feature_columns]
-        y = data['delay']
+        # Select features and target; the model is fitted on a plain array so
+        # predictions can be made from arrays without a DataFrame per call
+        X = data[self.feature_columns].to_numpy(dtype=np.float32)
+        y = data['delay'].to_numpy()
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -52,12 +87,18 @@ class WaitTimePredictionModel:
         # Train model
         self.model.fit(X_train, y_train)
         self.is_trained = True
+        self.clear_prediction_cache()
         
         # Evaluate
         y_pred = self.model.predict(X_test)
         mae = mean_absolute_error(y_test, y_pred)
         rmse = np.sqrt(mean_squared_error(y_test, y_pred))
         
+        # Feature importances cost more than the fit itself and only reports
+        # use them, so keep the held-out split and compute them on request
+        self.feature_importances = {}
+        self._held_out = (X_test, y_test)
+        
         return {
             'mae': mae,
             'rmse': rmse,
@@ -72,14 +113,10 @@ class WaitTimePredictionModel:
             # Fallback to simple calculation if model not trained
             return queue_length * avg_consultation_time
         
-        hour = scheduled_time.hour
-        day_of_week = scheduled_time.weekday()
-        
-        features = pd.DataFrame([[
-            doctor_id, hour, day_of_week, queue_length, avg_consultation_time
-        ]], columns=self.feature_columns)
-        
-        predicted_delay = self.model.predict(features)[0]
+        predicted_delay = self._predict_delay(
+            doctor_id, scheduled_time.hour, scheduled_time.weekday(),
+            queue_length, avg_consultation_time
+        )
         
         # Base wait time = queue_length * avg_consultation_time + predicted delay
         base_wait = queue_length * avg_consultation_time
@@ -87,40 +124,64 @@ class WaitTimePredictionModel:
         
         return total_wait
     
+    def _model_delay(self, doctor_id: int, hour: int, day_of_week: int,
+                     queue_length: int, avg_consultation_time: float) -> float:
+        """Run the model on a single feature row"""
+        features = np.array([[
+            doctor_id, hour, day_of_week, queue_length, avg_consultation_time
+        ]], dtype=np.float32)
+        return float(self.model.predict(features)[0])
+    
+    def clear_prediction_cache(self):
+        """Drop memoized predictions, e.g. after the model changes"""
+        self._predict_delay.cache_clear()
+    
     def batch_predict(self, patients_data: List[Dict]) -> List[float]:
         """Predict wait times for multiple patients"""
         if not patients_data:
             return []
         
-        predictions = []
-        for patient in patients_data:
-            wait_time = self.predict_wait_time(
-                doctor_id=patient['doctor_id'],
-                scheduled_time=patient['scheduled_time'],
-                queue_length=patient['queue_length'],
-                avg_consultation_time=patient['avg_consultation_time']
-            )
-            predictions.append(wait_time)
+        queue_lengths = np.fromiter((p['queue_length'] for p in patients_data), dtype=np.float64)
+        avg_times = np.fromiter((p['avg_consultation_time'] for p in patients_data), dtype=np.float64)
+        base_wait = queue_lengths * avg_times
         
-        return predictions
+        if not self.is_trained:
+            # Fallback to simple calculation if model not trained
+            return base_wait.tolist()
+        
+        # One model call for the whole batch instead of one per patient
+        X = np.column_stack([
+            np.fromiter((p['doctor_id'] for p in patients_data), dtype=np.float32),
+            np.fromiter((p['scheduled_time'].hour for p in patients_data), dtype=np.float32),
+            np.fromiter((p['scheduled_time'].weekday() for p in patients_data), dtype=np.float32),
+            queue_lengths.astype(np.float32),
+            avg_times.astype(np.float32)
+        ])
+        predicted_delays = self.model.predict(X)
+        
+        return np.maximum(0, base_wait + predicted_delays).tolist()
     
     def save_model(self, filepath: str):
         """Save trained model to disk"""
-        with open(filepath, 'wb') as f:
-            pickle.dump({
-                'model': self.model,
-                'is_trained': self.is_trained,
-                'feature_columns': self.feature_columns
-            }, f)
+        import joblib
+        
+        # Left uncompressed so load_model can memory-map the arrays
+        joblib.dump({
+            'model': self.model,
+            'is_trained': self.is_trained,
+            'feature_columns': self.feature_columns,
+            'feature_importances': self.get_feature_importance()
+        }, filepath)
     
     def load_model(self, filepath: str):
         """Load trained model from disk"""
         if os.path.exists(filepath):
-            with open(filepath, 'rb') as f:
-                data = pickle.load(f)
-                self.model = data['model']
-                self.is_trained = data['is_trained']
-                self.feature_columns = data['feature_columns']
+            import joblib
+            data = joblib.load(filepath, mmap_mode='r')
+            self.model = data['model']
+            self.is_trained = data['is_trained']
+            self.feature_columns = data['feature_columns']
+            self.feature_importances = data.get('feature_importances', {})
             return True
         return False
     
@@ -129,8 +190,19 @@ class WaitTimePredictionModel:
         if not self.is_trained:
             return {}
         
-        importances = self.model.feature_importances_
-        return dict(zip(self.feature_columns, importances))
+        if not self.feature_importances and self._held_out is not None:
+            from sklearn.inspection import permutation_importance
+            
+            # Boosted trees have no impurity-based importances, so measure how
+            # much the held-out score drops when each feature is shuffled
+            X_test, y_test = self._held_out
+            importance = permutation_importance(
+                self.model, X_test, y_test, n_repeats=5, random_state=42
+            )
+            self.feature_importances = dict(zip(self.feature_columns, importance.importances_mean))
+            self._held_out = None
+        
+        return dict(self.feature_importances)
 
 
 class DoctorProfileManager:
@@ -138,6 +210,7 @@ class DoctorProfileManager:
     
     def __init__(self):
         self.doctor_profiles: Dict[int, Dict] = {}
+        self._best_doctor: Optional[int] = None  # cached recommend_doctor result
     
     def add_doctor(self, doctor_id: int, name: str, specialty: str, 
                    avg_consultation_time: float):
@@ -149,22 +222,27 @@ class DoctorProfileManager:
             'total_consultations': 0,
             'total_time': 0.0
         }
+        self._best_doctor = None
     
     def update_consultation_stats(self, doctor_id: int, consultation_time: float):
         """Update doctor's consultation statistics"""
-        if doctor_id in self.doctor_profiles:
-            profile = self.doctor_profiles[doctor_id]
-            profile['total_consultations'] += 1
-            profile['total_time'] += consultation_time
-            profile['avg_consultation_time'] = (
-                profile['total_time'] / profile['total_consultations']
-            )
+        profile = self.doctor_profiles.get(doctor_id)
+        if profile is None:
+            return
+        
+        profile['total_consultations'] += 1
+        profile['total_time'] += consultation_time
+        profile['avg_consultation_time'] = (
+            profile['total_time'] / profile['total_consultations']
+        )
+        self._best_doctor = None
     
     def get_avg_consultation_time(self, doctor_id: int) -> float:
         """Get average consultation time for a doctor"""
-        if doctor_id in self.doctor_profiles:
-            return self.doctor_profiles[doctor_id]['avg_consultation_time']
-        return 15.0  # Default 15 minutes
+        profile = self.doctor_profiles.get(doctor_id)
+        if profile is None:
+            return 15.0  # Default 15 minutes
+        return profile['avg_consultation_time']
     
     def get_all_doctors(self) -> List[Dict]:
         """Get all doctor profiles"""
@@ -178,13 +256,12 @@ class DoctorProfileManager:
         if not self.doctor_profiles:
             return 1
         
-        # Simple recommendation: doctor with lowest avg consultation time
-        min_time = float('inf')
-        recommended_id = list(self.doctor_profiles.keys())[0]
-        
-        for doctor_id, profile in self.doctor_profiles.items():
-            if profile['avg_consultation_time'] < min_time:
-                min_time = profile['avg_consultation_time']
-                recommended_id = doctor_id
+        # Simple recommendation: doctor with lowest avg consultation time,
+        # cached until a profile changes
+        if self._best_doctor is None:
+            self._best_doctor = min(
+                self.doctor_profiles.items(),
+                key=lambda item: item[1]['avg_consultation_time']
+            )[0]
         
-        return recommended_id
+        return self._best_doctor
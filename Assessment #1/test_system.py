@@ -4,15 +4,27 @@ Tests core functionality of all modules
 """
 
 import unittest
+from unittest import mock
 from datetime import datetime, timedelta
+from typing import Optional
 import pandas as pd
+import numpy as np
+import hashlib
+import io
+import importlib.util
+import json
 import os
 import sys
+import threading
+import time
+import asyncio
 
 from patient_queue import Patient, PatientQueue
 from predictive_model import WaitTimePredictionModel, DoctorProfileManager
+import data_generator
 from data_generator import AppointmentDataGenerator
 from dashboard import Dashboard, NotificationService
+from main import PatientFlowManagementSystem
 
 
 class TestPatientQueue(unittest.TestCase):
@@ -28,7 +40,7 @@ class TestPatientQueue(unittest.TestCase):
         
         self.assertIsNotNone(patient_id)
         self.assertIn(patient_id, self.queue.all_patients)
-        self.assertEqual(len(self.queue.queues[1]), 1)
+        self.assertEqual(len(self.queue.waiting[1]), 1)
     
     def test_queue_position(self):
         """Test queue position tracking"""
@@ -44,6 +56,21 @@ class TestPatientQueue(unittest.TestCase):
         self.assertEqual(self.queue.get_queue_position(id2), 2)
         self.assertEqual(self.queue.get_queue_position(id3), 3)
     
+    def test_queue_position_after_changes(self):
+        """Test positions shift when patients leave the queue"""
+        patients = [Patient(name=f"Patient {i}", doctor_id=1) for i in range(4)]
+        for p in patients:
+            self.queue.register_patient(p)
+        
+        self.queue.start_consultation(1)
+        self.queue.complete_consultation(patients[2].patient_id)
+        
+        self.assertIsNone(self.queue.get_queue_position(patients[0].patient_id))
+        self.assertEqual(self.queue.get_queue_position(patients[1].patient_id), 1)
+        self.assertIsNone(self.queue.get_queue_position(patients[2].patient_id))
+        self.assertEqual(self.queue.get_queue_position(patients[3].patient_id), 2)
+        self.assertEqual(self.queue.get_queue_length(1), 2)
+    
     def test_queue_length(self):
         """Test queue length calculation"""
         for i in range(5):
@@ -53,6 +80,20 @@ class TestPatientQueue(unittest.TestCase):
         self.assertEqual(self.queue.get_queue_length(1), 5)
         self.assertEqual(self.queue.get_queue_length(2), 0)
     
+    def test_queue_snapshot(self):
+        """Test per-doctor queue lengths and waiting positions in one pass"""
+        p1 = Patient(name="Patient 1", doctor_id=1)
+        p2 = Patient(name="Patient 2", doctor_id=1)
+        p3 = Patient(name="Patient 3", doctor_id=2)
+        for p in (p1, p2, p3):
+            self.queue.register_patient(p)
+        
+        self.assertEqual(self.queue.queue_lengths(), {1: 2, 2: 1})
+        
+        positions = {p.patient_id: pos for p, pos in self.queue.iter_waiting_with_position()}
+        for p in (p1, p2, p3):
+            self.assertEqual(positions[p.patient_id], self.queue.get_queue_position(p.patient_id))
+    
     def test_start_consultation(self):
         """Test starting consultation"""
         patient = Patient(name="Test Patient", doctor_id=1)
@@ -70,9 +111,11 @@ class TestPatientQueue(unittest.TestCase):
         patient_id = self.queue.register_patient(patient)
         
         self.queue.start_consultation(1)
+        self.assertEqual(self.queue.get_patients_in_consultation(1), [patient])
         self.queue.complete_consultation(patient_id)
         
         self.assertEqual(patient.status, "completed")
+        self.assertEqual(self.queue.get_patients_in_consultation(), [])
     
     def test_statistics(self):
         """Test queue statistics"""
@@ -86,6 +129,46 @@ class TestPatientQueue(unittest.TestCase):
         self.assertEqual(stats['waiting'], 3)
         self.assertEqual(stats['in_consultation'], 0)
         self.assertEqual(stats['completed'], 0)
+    
+    def test_statistics_after_consultations(self):
+        """Test statistics track status changes"""
+        patients = [Patient(name=f"Patient {i}", doctor_id=1 + i % 2) for i in range(4)]
+        for p in patients:
+            self.queue.register_patient(p)
+        
+        self.queue.start_consultation(1)
+        self.queue.start_consultation(2)
+        self.queue.complete_consultation(patients[0].patient_id)
+        self.queue.complete_consultation(patients[0].patient_id)  # repeat is a no-op
+        
+        stats = self.queue.get_statistics()
+        
+        self.assertEqual(stats['waiting'], 2)
+        self.assertEqual(stats['in_consultation'], 1)
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['doctors_busy'], 2)
+    
+    def test_register_same_patient_twice(self):
+        """Test re-registering an active patient is a no-op and a completed one re-queues"""
+        patient = Patient(name="Test Patient", doctor_id=1)
+        patient_id = self.queue.register_patient(patient)
+        self.queue.register_patient(patient)  # still waiting
+        
+        self.assertEqual(self.queue.get_queue_length(1), 1)
+        self.assertEqual(self.queue.get_statistics()['waiting'], 1)
+        
+        self.queue.start_consultation(1)
+        self.queue.register_patient(patient)  # in consultation
+        self.assertIsNone(self.queue.start_consultation(1))
+        
+        self.queue.complete_consultation(patient_id)
+        self.queue.register_patient(patient)  # back for a follow-up
+        
+        stats = self.queue.get_statistics()
+        self.assertEqual(patient.status, "waiting")
+        self.assertEqual(self.queue.get_queue_position(patient_id), 1)
+        self.assertEqual((stats['total_patients'], stats['waiting'], stats['completed']), (1, 1, 0))
+        self.assertIs(self.queue.start_consultation(1), patient)
 
 
 class TestDoctorProfileManager(unittest.TestCase):
@@ -132,6 +215,15 @@ class TestDoctorProfileManager(unittest.TestCase):
         
         recommended = self.manager.recommend_doctor(datetime.now())
         self.assertEqual(recommended, 2)  # Should recommend doctor with shortest time
+    
+    def test_recommend_doctor_after_stats_update(self):
+        """Test recommendation follows consultation stat changes"""
+        self.manager.add_doctor(1, "Dr. Smith", "Cardiology", 20.0)
+        self.manager.add_doctor(2, "Dr. Jones", "Dermatology", 10.0)
+        self.assertEqual(self.manager.recommend_doctor(datetime.now()), 2)
+        
+        self.manager.update_consultation_stats(2, 30.0)
+        self.assertEqual(self.manager.recommend_doctor(datetime.now()), 1)
 
 
 class TestWaitTimePredictionModel(unittest.TestCase):
@@ -152,6 +244,29 @@ class TestWaitTimePredictionModel(unittest.TestCase):
         # Should use simple calculation: queue_length * avg_consultation_time
         self.assertEqual(wait_time, 45.0)
     
+    def test_batch_predict_fallback(self):
+        """Test batch prediction matches single predictions when not trained"""
+        patients = [
+            {'doctor_id': 1, 'scheduled_time': datetime(2024, 1, 1, 9, 0),
+             'queue_length': 3, 'avg_consultation_time': 15.0},
+            {'doctor_id': 2, 'scheduled_time': datetime(2024, 1, 1, 18, 0),
+             'queue_length': 0, 'avg_consultation_time': 10.0},
+        ]
+        
+        self.assertEqual(self.model.batch_predict(patients), [45.0, 0.0])
+        self.assertEqual(self.model.batch_predict([]), [])
+    
+    def test_replacing_model_clears_prediction_cache(self):
+        """Test assigning a new estimator drops memoized predictions"""
+        when = datetime(2024, 1, 1, 9, 0)
+        self.model.is_trained = True
+        
+        self.model.model = mock.Mock(**{'predict.return_value': np.array([10.0])})
+        self.assertEqual(self.model.predict_wait_time(1, when, 2, 15.0), 40.0)
+        
+        self.model.model = mock.Mock(**{'predict.return_value': np.array([100.0])})
+        self.assertEqual(self.model.predict_wait_time(1, when, 2, 15.0), 130.0)
+    
     def test_train_model(self):
         """Test model training"""
         # Generate sample data
@@ -177,15 +292,24 @@ class TestWaitTimePredictionModel(unittest.TestCase):
         
         df = pd.DataFrame(data)
         
-        # Add more samples for proper training
-        for i in range(10):
-            df = pd.concat([df, df], ignore_index=True)
+        # Add more samples for proper training (1024 copies in one allocation)
+        df = df.loc[np.tile(df.index.values, 2 ** 10)].reset_index(drop=True)
         
         metrics = self.model.train(df)
         
         self.assertTrue(self.model.is_trained)
         self.assertIn('mae', metrics)
         self.assertIn('rmse', metrics)
+        
+        # Repeated predictions for the same features are served from the memo
+        first = self.model.predict_wait_time(1, datetime(2024, 1, 1, 9, 0), 2, 15.0)
+        second = self.model.predict_wait_time(1, datetime(2024, 1, 1, 9, 30), 2, 15.0)
+        self.assertEqual(first, second)
+        self.assertEqual(self.model._predict_delay.cache_info().hits, 1)
+        
+        # Importances are computed from the held-out split on first request
+        importances = self.model.get_feature_importance()
+        self.assertEqual(set(importances), set(self.model.feature_columns))
 
 
 class TestDataGenerator(unittest.TestCase):
@@ -202,8 +326,7 @@ class TestDataGenerator(unittest.TestCase):
         self.assertEqual(len(records), 100)
         
         # Check peak hour distribution (75%)
-        peak_count = sum(1 for r in records 
-                        if pd.to_datetime(r['scheduled_time']).hour >= 17)
+        peak_count = (records['scheduled_time'].dt.hour >= 17).sum()
         self.assertGreaterEqual(peak_count, 70)  # Should be around 75
     
     def test_generate_historical_data(self):
@@ -216,6 +339,31 @@ class TestDataGenerator(unittest.TestCase):
         # Should have ~250 records (50 per day * 5 days)
         self.assertGreater(len(df), 200)
         self.assertLess(len(df), 300)
+        
+        # A reversed range yields no appointments rather than an error
+        self.assertEqual(len(self.generator.generate_historical_data(end_date, start_date, 50)), 0)
+    
+    def test_delay_kernels_agree(self):
+        """Test the loop (numba) and vectorized delay kernels give the same result"""
+        rng = np.random.default_rng(0)
+        size = 2000
+        # Wide noise so both the peak-hour branch and the clamps are exercised
+        args = (
+            rng.integers(1, 6, size), rng.integers(9, 20, size),
+            self.generator._avg_consult, self.generator._variance,
+            rng.normal(5, 10, size), rng.normal(15, 10, size),
+            rng.integers(0, 6, size) * rng.uniform(5, 15, size), rng.standard_normal(size) * 4
+        )
+        
+        loop_delay, loop_consult = data_generator._gen_delays_loop(*args)
+        numpy_delay, numpy_consult = data_generator._gen_delays_numpy(*args)
+        self.assertTrue(np.allclose(loop_delay, numpy_delay))
+        self.assertTrue(np.allclose(loop_consult, numpy_consult))
+        
+        # Whichever kernel this environment selected matches as well
+        delay, consult = data_generator._gen_delays(*args)
+        self.assertTrue(np.allclose(delay, numpy_delay))
+        self.assertTrue(np.allclose(consult, numpy_consult))
     
     def test_doctor_profiles(self):
         """Test doctor profile generation"""
@@ -227,6 +375,79 @@ class TestDataGenerator(unittest.TestCase):
             self.assertIn('specialty', profile)
 
 
+class TestDashboard(unittest.TestCase):
+    """Test in-place dashboard redraws"""
+    
+    def setUp(self):
+        self.dashboard = Dashboard()
+        self.dashboard._prev_lines = ["header", "row 1", "row 2"]
+    
+    def _capture(self, func, *args, **kwargs) -> str:
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as out:
+            func(*args, **kwargs)
+        return out.getvalue()
+    
+    def test_diff_rewrites_only_changed_rows(self):
+        """Test only rows that differ from the previous frame are rewritten"""
+        output = self._capture(self.dashboard._write_diff, ["header", "row 1*", "row 2"])
+        
+        # Row 2 is cleared and rewritten, then the cursor goes below the frame
+        self.assertEqual(output, "\x1b[2;1H\x1b[2Krow 1*\x1b[4;1H")
+    
+    def test_diff_blanks_rows_of_taller_previous_frame(self):
+        """Test rows left over from a taller previous frame are cleared"""
+        output = self._capture(self.dashboard._write_diff, ["header"])
+        
+        self.assertEqual(output, "\x1b[2;1H\x1b[2K\x1b[3;1H\x1b[2K\x1b[2;1H")
+    
+    def test_repeat_display_redraws_in_place(self):
+        """Test a second full dashboard display diffs instead of clearing"""
+        self.dashboard._prev_lines = []
+        self.dashboard.is_tty = True
+        stats = {'total_patients': 1, 'waiting': 1, 'in_consultation': 0,
+                 'completed': 0, 'doctors_busy': 0}
+        args = (stats, [], [], None, "Press Enter")
+        
+        with mock.patch('shutil.get_terminal_size', return_value=os.terminal_size((80, 100))):
+            first = self._capture(self.dashboard.display_full_dashboard, *args)
+            stats['completed'] = 1
+            second = self._capture(self.dashboard.display_full_dashboard, *args)
+        
+        self.assertIn("\x1b[2J", first)
+        self.assertNotIn("\x1b[2J", second)
+        self.assertIn("Completed:                   1", second)
+        self.assertNotIn("Press Enter", second)  # unchanged footer is not rewritten
+    
+    def test_unchanged_frame_is_not_redrawn(self):
+        """Test a repeat display with the same data writes nothing"""
+        self.dashboard._prev_lines = []
+        self.dashboard.is_tty = True
+        stats = {'total_patients': 1, 'waiting': 1, 'in_consultation': 0,
+                 'completed': 0, 'doctors_busy': 0}
+        
+        with mock.patch('shutil.get_terminal_size', return_value=os.terminal_size((80, 100))):
+            self._capture(self.dashboard.display_full_dashboard, stats, [], [])
+            with mock.patch('sys.stdout', new_callable=io.StringIO) as out:
+                live = self.dashboard.display_full_dashboard(stats, [], [])
+        
+        self.assertTrue(live)
+        self.assertEqual(out.getvalue(), "")
+    
+    def test_frame_taller_than_terminal_is_not_live(self):
+        """Test a frame that does not fit is fully redrawn and reported as not live"""
+        self.dashboard._prev_lines = []
+        self.dashboard.is_tty = True
+        stats = {'total_patients': 1, 'waiting': 1, 'in_consultation': 0,
+                 'completed': 0, 'doctors_busy': 0}
+        
+        with mock.patch('shutil.get_terminal_size', return_value=os.terminal_size((80, 10))):
+            with mock.patch('sys.stdout', new_callable=io.StringIO) as out:
+                live = self.dashboard.display_full_dashboard(stats, [], [])
+        
+        self.assertFalse(live)
+        self.assertIn("\x1b[2J", out.getvalue())
+
+
 class TestNotificationService(unittest.TestCase):
     """Test notification service"""
     
@@ -256,6 +477,32 @@ class TestNotificationService(unittest.TestCase):
         history = self.service.get_notification_history()
         
         self.assertEqual(len(history), 2)
+    
+    def test_wait_time_notifications_batched(self):
+        """Test repeated wait time updates within a window are coalesced"""
+        service = NotificationService(batch_window=60.0)
+        service.send_wait_time_notification("P001", 30.0)
+        service.send_wait_time_notification("P002", 20.0)
+        service.send_wait_time_notification("P001", 25.0)
+        
+        history = service.get_notification_history()
+        
+        self.assertEqual([n['patient_id'] for n in history], ["P002", "P001"])
+        self.assertEqual(service.total_sent, 2)
+        self.assertIn("25", history[1]['message'])
+    
+    def test_notification_history_limit(self):
+        """Test history is capped and last_n returns the most recent"""
+        service = NotificationService(max_history=3)
+        for i in range(5):
+            service.send_ready_notification(f"P00{i}")
+        
+        history = service.get_notification_history()
+        recent = service.get_notification_history(last_n=2)
+        
+        self.assertEqual([n['patient_id'] for n in history], ["P002", "P003", "P004"])
+        self.assertEqual([n['patient_id'] for n in recent], ["P003", "P004"])
+        self.assertEqual(service.total_sent, 5)  # keeps counting past the cap
 
 
 class TestIntegration(unittest.TestCase):
@@ -284,10 +531,107 @@ class TestIntegration(unittest.TestCase):
         # Complete consultation
         queue.complete_consultation(patient_id)
         self.assertEqual(patient.status, "completed")
+    
+    def test_dashboard_view_draws_tall_frame_once(self):
+        """Test the dashboard view only refreshes while the frame fits the terminal"""
+        draws = {}
+        for rows in (10, 200):
+            system = PatientFlowManagementSystem()
+            system.dashboard.is_tty = True
+            system.dashboard_refresh_interval = 0.01
+            
+            def slow_input(prompt):
+                time.sleep(0.3)
+                return ""
+            
+            with mock.patch('builtins.input', slow_input), \
+                    mock.patch('shutil.get_terminal_size', return_value=os.terminal_size((80, rows))), \
+                    mock.patch('sys.stdout', new_callable=io.StringIO), \
+                    mock.patch.object(system, '_draw_dashboard', wraps=system._draw_dashboard) as draw:
+                asyncio.run(system._view_dashboard_interactive())
+            draws[rows] = draw.call_count
+        
+        self.assertEqual(draws[10], 1)
+        self.assertGreater(draws[200], 1)
+    
+    def test_menu_input_strips_line(self):
+        """Test menu prompts return the stripped line read from stdin"""
+        system = PatientFlowManagementSystem()
+        with mock.patch('builtins.input', return_value="  3 \n"):
+            self.assertEqual(asyncio.run(system._input("> ")), "3")
+    
+    def test_pending_input_does_not_block_shutdown(self):
+        """Test a prompt still waiting for input does not hold up loop shutdown"""
+        system = PatientFlowManagementSystem()
+        release = threading.Event()
+        
+        def blocked_input(prompt):
+            release.wait()
+            return ""
+        
+        async def interrupted_prompt():
+            # Cancelling the pending read stands in for Ctrl+C at a menu prompt
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(system._input("> "), timeout=0.1)
+        
+        runner = threading.Thread(target=asyncio.run, args=(interrupted_prompt(),))
+        with mock.patch('builtins.input', blocked_input):
+            runner.start()
+            runner.join(timeout=5)
+            finished = not runner.is_alive()
+            release.set()
+        
+        self.assertTrue(finished, "asyncio.run waited for the blocked input() reader")
+
+
+# Modules under test; together with this file they key the result cache
+_TESTED_MODULES = ('patient_queue', 'predictive_model', 'data_generator', 'dashboard', 'main')
+_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           '.pytest_cache', 'verify_cache.json')
 
 
-def run_tests():
-    """Run all tests"""
+def _source_checksum() -> str:
+    """Hash the sources under test and the environment they run in"""
+    import joblib
+    import sklearn
+    
+    # A library upgrade or numba being (un)installed changes the code paths
+    # exercised just as much as a source edit does
+    environment = [
+        sys.version, np.__version__, pd.__version__, sklearn.__version__,
+        joblib.__version__, f"numba jit: {data_generator.njit is not None}",
+        getattr(sys.modules.get('numba'), '__version__', 'no numba'),
+    ]
+    
+    digest = hashlib.blake2b("\n".join(environment).encode())
+    paths = [os.path.abspath(__file__)]
+    paths.extend(importlib.util.find_spec(name).origin for name in _TESTED_MODULES)
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _last_passing_checksum() -> Optional[str]:
+    """Read the checksum of the last passing run, None if there is none"""
+    try:
+        with open(_CACHE_FILE) as f:
+            return json.load(f).get('passed')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def run_tests(use_cache: bool = True):
+    """Run all tests
+    
+    If the suite already passed for the current sources, the run is skipped.
+    """
+    checksum = _source_checksum()
+    if use_cache and _last_passing_checksum() == checksum:
+        print("All tests passed previously for the current sources; skipping run "
+              "(use --no-cache to force).")
+        return True
+    
     # Create test suite
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
@@ -297,6 +641,7 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestDoctorProfileManager))
     suite.addTests(loader.loadTestsFromTestCase(TestWaitTimePredictionModel))
     suite.addTests(loader.loadTestsFromTestCase(TestDataGenerator))
+    suite.addTests(loader.loadTestsFromTestCase(TestDashboard))
     suite.addTests(loader.loadTestsFromTestCase(TestNotificationService))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
     
@@ -304,9 +649,19 @@ def run_tests():
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
     
+    # Remember a pass for these sources; a cache that cannot be written only
+    # means the next run is not skipped
+    if result.wasSuccessful():
+        try:
+            os.makedirs(os.path.dirname(_CACHE_FILE), exist_ok=True)
+            with open(_CACHE_FILE, 'w') as f:
+                json.dump({'passed': checksum}, f)
+        except OSError:
+            pass
+    
     return result.wasSuccessful()
 
 
 if __name__ == "__main__":
-    success = run_tests()
+    success = run_tests(use_cache="--no-cache" not in sys.argv)
     sys.exit(0 if success else 1)